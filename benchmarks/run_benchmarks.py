@@ -0,0 +1,405 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from src.text_cleaner import clean_text
+from crawler_carrefour import parse_product_names
+
+
+def load_module_from_path(name: str, path: str):
+    """
+    Imports a script that is not part of a package (e.g. the scripts in 'old/').
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_of(func, repeat: int) -> float:
+    """
+    Runs func `repeat` times and returns the fastest wall-clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_result(name: str, value: float, unit: str, higher_is_better: bool, **params) -> dict:
+    return {
+        'name': name,
+        'value': value,
+        'unit': unit,
+        'higher_is_better': higher_is_better,
+        'params': params
+    }
+
+
+# --- FIXTURES ---
+
+def load_product_names(products_csv_path: str) -> list[str]:
+    df = pd.read_csv(products_csv_path)
+    return df['nome'].dropna().astype(str).tolist()
+
+
+def render_collection_page(product_names: list[str]) -> str:
+    """
+    Renders an HTML page with the same product markup as a Carrefour collection page.
+    """
+    cards = '\n'.join(
+        f'<div class="product-card"><a href="/p/{i}"><h2 class="truncate-text h-12">{name}</h2></a>'
+        f'<span class="price">R$ 9,99</span></div>'
+        for i, name in enumerate(product_names)
+    )
+    return f'<html><head><title>Carrefour</title></head><body><main><section>{cards}</section></main></body></html>'
+
+
+def load_html_pages(html_dir: str, product_names: list[str], page_size: int = 60) -> list[str]:
+    """
+    Loads saved HTML pages from html_dir. If no directory is given, pages are rendered
+    from the product catalog, page_size products per page (as the crawler requests).
+    """
+    if html_dir:
+        pages = []
+        for filename in sorted(os.listdir(html_dir)):
+            if filename.endswith('.html'):
+                with open(os.path.join(html_dir, filename), 'r', encoding='utf-8') as f:
+                    pages.append(f.read())
+        return pages
+    return [render_collection_page(product_names[i:i + page_size]) for i in range(0, len(product_names), page_size)]
+
+
+def make_embeddings_frame(n: int, dim: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Builds a DataFrame in the format written by 'old/generate_product_embeddings.py'.
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    return pd.DataFrame({
+        'nome': [f'produto {i}' for i in range(n)],
+        'embedding': [str(e.tolist()) for e in embeddings]
+    })
+
+
+# --- BENCHMARKS ---
+
+def bench_clean_text(product_names: list[str], repeat: int) -> list[dict]:
+    seconds = best_of(lambda: [clean_text(name) for name in product_names], repeat)
+    return [make_result('clean_text', len(product_names) / seconds, 'rows/s', True, n=len(product_names))]
+
+
+def bench_html_parsing(pages: list[str], repeat: int) -> list[dict]:
+    seconds = best_of(lambda: [parse_product_names(page) for page in pages], repeat)
+    return [make_result('parse_product_names', len(pages) / seconds, 'pages/s', True, n=len(pages))]
+
+
+def bench_clustering(sizes: list[int], dim: int, thresholds: list[float], repeat: int) -> list[dict]:
+    from scipy.cluster.hierarchy import linkage, fcluster
+    clustering = load_module_from_path('hierarchical_clustering', os.path.join(REPO_DIR, 'old', 'hierarchical_clustering.py'))
+
+    results = []
+    for n in sizes:
+        df = make_embeddings_frame(n, dim)
+        embeddings = clustering.load_embeddings(df)
+        results.append(make_result('load_embeddings', best_of(lambda: clustering.load_embeddings(df), repeat), 's', False, n=n, dim=dim))
+        results.append(make_result('linkage', best_of(lambda: linkage(embeddings, method='complete', metric='cosine'), repeat), 's', False, n=n, dim=dim))
+
+        Z = linkage(embeddings, method='complete', metric='cosine')
+        seconds = best_of(lambda: [fcluster(Z, t=t, criterion='distance') for t in thresholds], repeat)
+        results.append(make_result('fcluster', seconds, 's', False, n=n, levels=len(thresholds)))
+    return results
+
+
+def bench_classifier(model_path: str, product_names: list[str], json_path: str, num_items: int, batch_size: int) -> list[dict]:
+    """
+    Measures the zero-shot classifier the way leaf_classifier.py runs it: same hypothesis template
+    and the same classify_names batching.
+    """
+    from src.model_loading import load_pipeline
+    from leaf_classifier import HYPOTHESIS_TEMPLATE, get_leaf_nodes, classify_names
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        leaf_labels = get_leaf_nodes(json.load(f))
+
+    classifier = load_pipeline(
+        "zero-shot-classification",
+        model=model_path,
+        model_path=model_path,
+        offline=True,
+        hypothesis_template=HYPOTHESIS_TEMPLATE
+    )
+    names = [clean_text(name) for name in product_names[:num_items]]
+
+    # Aquecimento: a primeira chamada inclui alocações que não se repetem
+    classify_names(classifier, names[:batch_size], leaf_labels, batch_size)
+
+    start = time.perf_counter()
+    classify_names(classifier, names, leaf_labels, batch_size)
+    seconds = time.perf_counter() - start
+    return [make_result('zero_shot_classifier', len(names) / seconds, 'items/s', True, n=len(names), labels=len(leaf_labels), batch_size=batch_size, model=os.path.basename(os.path.normpath(model_path)))]
+
+
+def make_catalogue_vectors(n: int, n_queries: int, dim: int, rank: int, spread: float, n_leaves: int = 300,
+                           variants: int = 3, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds vectors shaped like a product catalogue, in a random rank-`rank` subspace: leaf categories
+    (about as many as the leaves of categorias_supermercado.json), products spread around their leaf
+    (`spread` varies per leaf, from 0.67x to 1.33x) and a few naming variants of each product
+    (sizes, abbreviations). Half of the queries are new variants of indexed products, the other half
+    are products that are not in the index. With the default spread, a known product's closest
+    variant has cosine ~0.9 and the 10th neighbour ~0.6; the median pair is ~0.
+
+    Returns:
+        A tuple (database, queries).
+    """
+    rng = np.random.default_rng(seed)
+    n_products = max(1, n // variants)
+    leaves = rng.standard_normal((n_leaves, rank))
+    leaf_spread = spread * rng.uniform(0.67, 1.33, size=n_leaves)
+    product_leaves = rng.integers(0, n_leaves, size=n_products + n_queries)
+    products = leaves[product_leaves] + leaf_spread[product_leaves, None] * rng.standard_normal((n_products + n_queries, rank))
+
+    new_products = n_products + np.arange(n_queries - n_queries // 2)
+    product_ids = np.concatenate([rng.integers(0, n_products, size=n + n_queries // 2), new_products])
+    latent = products[product_ids] + 0.34 * rng.standard_normal((n + n_queries, rank))
+    vectors = (latent @ rng.standard_normal((rank, dim))).astype(np.float32)
+    return vectors[:n], vectors[n:]
+
+
+def make_noise_vectors(n: int, n_queries: int, dim: int, rank: int, spread: float, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Worst case without any neighbourhood structure: n/100 cluster centers buried in isotropic noise
+    of rank `rank`. With spread 2 the nearest neighbour has cosine ~0.37 against ~0.31 for the 10th,
+    so the "top-10" is mostly noise and no index (IVF here, HNSW via hnswlib alike) reaches high
+    recall without scanning a large share of the data.
+
+    Returns:
+        A tuple (database, queries).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, (n + n_queries) // 100), rank))
+    latent = centers[rng.integers(0, len(centers), size=n + n_queries)] + spread * rng.standard_normal((n + n_queries, rank))
+    vectors = (latent @ rng.standard_normal((rank, dim))).astype(np.float32)
+    return vectors[:n], vectors[n:]
+
+
+ANN_FIXTURES = {'catalogo': (make_catalogue_vectors, 1.0), 'ruido': (make_noise_vectors, 2.0)}
+
+
+def load_ann_vectors(embeddings_csv_path: str, fixture: str, n: int, dim: int, rank: int, spread: float, n_queries: int):
+    """
+    Returns (database, queries, source) for the ANN benchmark: held-out rows of a real
+    product_embeddings.csv when a path is given, otherwise a synthetic fixture (see ANN_FIXTURES).
+    spread=None uses the fixture's default.
+    """
+    if embeddings_csv_path:
+        clustering = load_module_from_path('hierarchical_clustering', os.path.join(REPO_DIR, 'old', 'hierarchical_clustering.py'))
+        vectors = clustering.load_embeddings(pd.read_csv(embeddings_csv_path)).astype(np.float32)
+        vectors = vectors[np.random.default_rng(42).permutation(len(vectors))]
+        return vectors[n_queries:], vectors[:n_queries], os.path.basename(embeddings_csv_path)
+
+    make_vectors, default_spread = ANN_FIXTURES[fixture]
+    spread = default_spread if spread is None else spread
+    database, queries = make_vectors(n, n_queries, dim, rank, spread)
+    return database, queries, f'{fixture}_rank{rank}_spread{spread}'
+
+
+def bench_ann(database: np.ndarray, queries: np.ndarray, source: str, k: int, n_probes: list[int]) -> list[dict]:
+    """
+    Measures build time, query latency and recall@k of the IVF index against exact search,
+    for each n_probe. The recall curve is what the default n_probe is chosen from.
+    """
+    ann_index = load_module_from_path('ann_index', os.path.join(REPO_DIR, 'old', 'src', 'ann_index.py'))
+    n, dim = database.shape
+    n_queries = len(queries)
+
+    start = time.perf_counter()
+    index = ann_index.IVFIndex().build(database, [str(i) for i in range(n)])
+    params = {'n': n, 'dim': dim, 'dados': source, 'n_lists': len(index.centroids)}
+    results = [make_result('ann_build', time.perf_counter() - start, 's', False, **params)]
+
+    exact = []
+    start = time.perf_counter()
+    for query in queries:
+        exact.append(set(index.search_exact(query, k)[0].tolist()))
+    results.append(make_result('exact_query', (time.perf_counter() - start) / n_queries * 1000, 'ms', False, **params))
+
+    for n_probe in n_probes:
+        latencies, hits = [], 0
+        for query, expected in zip(queries, exact):
+            start = time.perf_counter()
+            rows, _ = index.search(query, k, n_probe=n_probe)
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected.intersection(rows.tolist()))
+        latencies_ms = np.array(latencies) * 1000
+        results.append(make_result('ann_query_p50', float(np.percentile(latencies_ms, 50)), 'ms', False, **params, n_probe=n_probe))
+        results.append(make_result('ann_query_p99', float(np.percentile(latencies_ms, 99)), 'ms', False, **params, n_probe=n_probe))
+        results.append(make_result(f'ann_recall_at_{k}', hits / (k * n_queries), 'ratio', True, **params, n_probe=n_probe))
+    return results
+
+
+HEAVY_MODULES = ('torch', 'transformers', 'sentence_transformers')
+
+STARTUP_BUDGET_SECONDS = 1.0
+
+
+def bench_startup(scripts: list[str], repeat: int) -> list[dict]:
+    """
+    Measures the wall-clock time of '<script> --help' in a fresh interpreter, and checks
+    that importing the script does not pull in any heavy ML dependency.
+    """
+    results = []
+    for script in scripts:
+        command = [sys.executable, os.path.join(REPO_DIR, script), '--help']
+        seconds = best_of(lambda: subprocess.run(command, cwd=REPO_DIR, capture_output=True, check=True), repeat)
+
+        module = os.path.splitext(script)[0]
+        check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        imported = subprocess.run([sys.executable, '-c', check], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+
+        if seconds > STARTUP_BUDGET_SECONDS:
+            print(f"Aviso: '{script} --help' levou {seconds:.2f}s (limite: {STARTUP_BUDGET_SECONDS:.1f}s).")
+        if imported:
+            print(f"Aviso: importar '{script}' carrega dependências pesadas: {imported}.")
+        result = make_result('startup', seconds, 's', False, script=script)
+        result['heavy_imports'] = imported.split(',') if imported else []
+        results.append(result)
+    return results
+
+
+# --- COMPARAÇÃO ---
+
+def result_key(result: dict) -> str:
+    params = ','.join(f'{k}={v}' for k, v in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare_results(current: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Compares two benchmark runs and returns a description of every regression larger than tolerance.
+
+    Args:
+        current: Results of the current run.
+        baseline: Results of the reference run.
+        tolerance: Allowed relative slowdown (0.1 = 10%).
+
+    Returns:
+        A list of human-readable regression messages (empty if none).
+    """
+    baseline_by_key = {result_key(r): r for r in baseline}
+    regressions = []
+    for result in current:
+        key = result_key(result)
+        reference = baseline_by_key.get(key)
+        if reference is None or reference['value'] == 0:
+            continue
+        change = (result['value'] - reference['value']) / reference['value']
+        slowdown = -change if result['higher_is_better'] else change
+        status = 'REGRESSÃO' if slowdown > tolerance else 'ok'
+        print(f"{status:>9}  {key}: {reference['value']:.4g} -> {result['value']:.4g} {result['unit']} ({change:+.1%})")
+        if slowdown > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os benchmarks do pipeline offline e salva os resultados em JSON.")
+    parser.add_argument("--only", nargs='+', choices=['startup', 'clean_text', 'html', 'clustering', 'ann', 'classifier'], default=None, help="Executa apenas os benchmarks indicados.")
+    parser.add_argument("--repeat", type=int, default=3, help="Número de repetições; é registrado o melhor tempo.")
+    parser.add_argument("--html_dir", type=str, default=None, help="Pasta com páginas HTML salvas do Carrefour. Se omitida, as páginas são geradas a partir do CSV.")
+    parser.add_argument("--cluster_sizes", type=int, nargs='+', default=[250, 500, 1000, 2000], help="Quantidades de produtos para o benchmark de clusterização.")
+    parser.add_argument("--embedding_dim", type=int, default=768, help="Dimensão dos embeddings sintéticos.")
+    parser.add_argument("--ann_size", type=int, default=100000, help="Número de produtos sintéticos no benchmark do índice de vizinhos.")
+    parser.add_argument("--ann_probes", type=int, nargs='+', default=[4, 8, 16, 32, 64], help="Valores de n_probe comparados no benchmark do índice de vizinhos.")
+    parser.add_argument("--ann_embeddings", type=str, default=None, help="product_embeddings.csv real para o benchmark do índice de vizinhos (no lugar dos vetores sintéticos).")
+    parser.add_argument("--ann_fixture", choices=sorted(ANN_FIXTURES), default='catalogo', help="Vetores sintéticos do benchmark do índice de vizinhos: 'catalogo' (categorias > produtos > variantes) ou 'ruido' (pior caso, sem vizinhança).")
+    parser.add_argument("--ann_rank", type=int, default=200, help="Dimensão intrínseca dos vetores sintéticos do benchmark do índice de vizinhos.")
+    parser.add_argument("--ann_spread", type=float, default=None, help="Dispersão dos vetores sintéticos (maior = mais difícil). Padrão: 1.0 em 'catalogo', 2.0 em 'ruido'.")
+    parser.add_argument("--nli_model", type=str, default=None, help="Pasta local com um modelo NLI pequeno. Sem ele, o benchmark do classificador é ignorado.")
+    parser.add_argument("--classifier_items", type=int, default=50, help="Número de produtos classificados no benchmark do classificador.")
+    parser.add_argument("--classifier_batch_size", type=int, default=1, help="Tamanho do lote do benchmark do classificador (como --batch_size do leaf_classifier.py).")
+    parser.add_argument("--output", type=str, default=None, help="Arquivo JSON de saída. Padrão: benchmarks/results/<data>.json")
+    parser.add_argument("--compare", type=str, default=None, help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora relativa tolerada antes de sinalizar regressão.")
+    args = parser.parse_args()
+
+    products_csv_path = os.path.join(REPO_DIR, 'data', 'produtos_carrefour.csv')
+    json_path = os.path.join(REPO_DIR, 'data', 'categorias_supermercado.json')
+    selected = set(args.only or ['startup', 'clean_text', 'html', 'clustering', 'ann', 'classifier'])
+
+    product_names = load_product_names(products_csv_path)
+    results = []
+
+    if 'startup' in selected:
+        print("Executando benchmark de inicialização...")
+        results.extend(bench_startup(['leaf_classifier.py', 'generate_categories.py'], args.repeat))
+
+    if 'clean_text' in selected:
+        print("Executando benchmark de clean_text...")
+        results.extend(bench_clean_text(product_names, args.repeat))
+
+    if 'html' in selected:
+        print("Executando benchmark de parsing HTML...")
+        pages = load_html_pages(args.html_dir, product_names)
+        results.extend(bench_html_parsing(pages, args.repeat))
+
+    if 'clustering' in selected:
+        print("Executando benchmark de clusterização...")
+        results.extend(bench_clustering(args.cluster_sizes, args.embedding_dim, [0.7, 0.8, 0.9, 1], args.repeat))
+
+    if 'ann' in selected:
+        print("Executando benchmark do índice de vizinhos (IVF x busca exata)...")
+        database, queries, source = load_ann_vectors(args.ann_embeddings, args.ann_fixture, args.ann_size, args.embedding_dim, args.ann_rank, args.ann_spread, n_queries=200)
+        results.extend(bench_ann(database, queries, source, k=10, n_probes=args.ann_probes))
+
+    if 'classifier' in selected:
+        if args.nli_model:
+            print(f"Executando benchmark do classificador com '{args.nli_model}'...")
+            results.extend(bench_classifier(args.nli_model, product_names, json_path, args.classifier_items, args.classifier_batch_size))
+        else:
+            print("Benchmark do classificador ignorado (use --nli_model para habilitar).")
+
+    for result in results:
+        print(f"{result_key(result)}: {result['value']:.4g} {result['unit']}")
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    output_path = args.output or os.path.join(SCRIPT_DIR, 'results', f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False, indent=4)
+    print(f"Resultados salvos em '{output_path}'.")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        print(f"\nComparando com '{args.compare}' (tolerância: {args.tolerance:.0%})...")
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressão(ões) detectada(s).")
+            sys.exit(1)
+        print("Nenhuma regressão detectada.")
+
+
+if __name__ == '__main__':
+    main()
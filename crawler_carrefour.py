@@ -34,6 +34,20 @@ def build_paginated_url(base_url: str, page_number: int) -> str:
     )
     return paginated_url
 
+def parse_product_names(html: str) -> list[str]:
+    """
+    Extrai os nomes dos produtos do HTML de uma página de coleção do Carrefour.
+
+    Args:
+        html: O conteúdo HTML da página.
+
+    Returns:
+        Uma lista com os nomes dos produtos, na ordem em que aparecem na página.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    products_on_page_elements = soup.find_all('h2', class_='truncate-text')
+    return [p.get_text(strip=True) for p in products_on_page_elements]
+
 def scrape_carrefour_product_names(url: str, session: requests.Session) -> list[str]:
     """
     Coleta os nomes de todos os produtos de uma URL de coleção do Carrefour,
@@ -65,14 +79,11 @@ def scrape_carrefour_product_names(url: str, session: requests.Session) -> list[
             print(f"Erro ao acessar a página {page_number + 1}: {e}")
             break
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        products_on_page_elements = soup.find_all('h2', class_='truncate-text')
+        current_page_products = parse_product_names(response.text)
         
-        if not products_on_page_elements:
+        if not current_page_products:
             break
         
-        current_page_products = [p.get_text(strip=True) for p in products_on_page_elements]
-        
         if current_page_products == last_page_products:
             print("[Debug] Página duplicada detectada, finalizando a coleta para esta URL.")
             break
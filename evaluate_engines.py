@@ -0,0 +1,250 @@
+import json
+import os
+import time
+import argparse
+import multiprocessing
+import numpy as np
+import pandas as pd
+from src.text_cleaner import clean_text
+from src.dedup import group_near_duplicates
+from src.model_loading import load_pipeline
+from src.profiling import get_peak_rss_mb
+from leaf_classifier import MODEL_NAME, HYPOTHESIS_TEMPLATE, get_leaf_nodes, get_leaf_paths, classify_names
+
+def seed_evaluation_set(classified_csv_path: str, output_csv_path: str) -> None:
+    """
+    Creates the evaluation set file from the classifier output, for manual review.
+
+    Each row keeps the model's label as a suggestion in 'categoria_correta' and starts with
+    'revisado' = False. Only rows whose 'categoria_correta' was checked (and fixed if needed)
+    and marked 'revisado' = True are used by the evaluation.
+
+    Args:
+        classified_csv_path: Path to the CSV written by leaf_classifier.py.
+        output_csv_path: Path of the evaluation set to create. Existing files are never overwritten.
+    """
+    if os.path.exists(output_csv_path):
+        print(f"Erro: '{output_csv_path}' já existe e não será sobrescrito.")
+        return
+
+    df = pd.read_csv(classified_csv_path)
+    eval_df = pd.DataFrame({
+        'produto_original': df['produto_original'],
+        'categoria_modelo': df['categoria_folha'],
+        'categoria_correta': df['categoria_folha'],
+        'revisado': False
+    })
+    eval_df.to_csv(output_csv_path, index=False, encoding='utf-8')
+    print(f"{len(eval_df)} linhas salvas em '{output_csv_path}'. Revise 'categoria_correta' e marque 'revisado' como True.")
+
+def load_evaluation_set(eval_csv_path: str, leaf_paths: dict) -> pd.DataFrame:
+    """
+    Reads the reviewed rows of the evaluation set, dropping labels that are not leaves of the category tree.
+    """
+    df = pd.read_csv(eval_csv_path)
+    df = df[df['revisado'].astype(str).str.lower() == 'true']
+
+    unknown = ~df['categoria_correta'].isin(leaf_paths)
+    if unknown.any():
+        print(f"Aviso: {unknown.sum()} linhas ignoradas por terem 'categoria_correta' fora da árvore de categorias.")
+    return df[~unknown].reset_index(drop=True)
+
+def build_configurations(models: list[str], batch_sizes: list[int], dedup_thresholds: list[float]) -> list[dict]:
+    """
+    Lists every combination of model, batch size and deduplication mode (None = no deduplication).
+    """
+    return [
+        {'modelo': model, 'batch_size': batch_size, 'dedup': dedup}
+        for model in models
+        for batch_size in batch_sizes
+        for dedup in [None] + dedup_thresholds
+    ]
+
+def configuration_name(config: dict) -> str:
+    model = os.path.basename(os.path.normpath(config['modelo']))
+    dedup = 'sem dedup' if config['dedup'] is None else f"dedup {config['dedup']}"
+    return f"{model} | batch {config['batch_size']} | {dedup}"
+
+def run_configuration(config: dict, names: list[str], leaf_labels: list[str], top_k: int, offline: bool) -> dict:
+    """
+    Classifies the names with one configuration of the zero-shot pipeline.
+
+    Meant to run in a fresh process, so that the reported peak memory belongs to this configuration only.
+
+    Returns:
+        A dictionary with the top_k ranked leaves per name, total seconds (cleaning, deduplication
+        and classification, excluding model loading), the latency of each name sent to the model
+        (the wall time of the whole batch call it belonged to), and peak RSS.
+    """
+    model_path = config['modelo'] if os.path.isdir(config['modelo']) else None
+    classifier = load_pipeline(
+        "zero-shot-classification",
+        model=config['modelo'],
+        model_path=model_path,
+        offline=offline,
+        hypothesis_template=HYPOTHESIS_TEMPLATE
+    )
+    batch_size = config['batch_size']
+
+    # Aquecimento com um lote cheio: a primeira chamada de cada tamanho inclui alocações que não se repetem
+    classify_names(classifier, [clean_text(name) for name in names[:batch_size]], leaf_labels, batch_size)
+
+    start = time.perf_counter()
+    cleaned_names = [clean_text(name) for name in names]
+    if config['dedup'] is not None:
+        group_ids = group_near_duplicates(names, threshold=config['dedup'])
+    else:
+        group_ids = list(range(len(cleaned_names)))
+
+    representatives = {}
+    for cleaned_name, group_id in zip(cleaned_names, group_ids):
+        representatives.setdefault(group_id, cleaned_name)
+    representative_names = list(representatives.values())
+
+    latencies = []
+    classifications = []
+    for chunk_start in range(0, len(representative_names), batch_size):
+        chunk = representative_names[chunk_start:chunk_start + batch_size]
+        chunk_start_time = time.perf_counter()
+        classifications.extend(classify_names(classifier, chunk, leaf_labels, batch_size))
+        # Cada item do lote só recebe a resposta quando a chamada inteira termina
+        latencies.extend([time.perf_counter() - chunk_start_time] * len(chunk))
+    seconds = time.perf_counter() - start
+
+    group_rankings = {
+        group_id: classification['labels'][:top_k]
+        for group_id, classification in zip(representatives, classifications)
+    }
+    return {
+        'rankings': [group_rankings[group_id] for group_id in group_ids],
+        'segundos': seconds,
+        'latencias': latencies,
+        'chamadas_modelo': len(representative_names),
+        'pico_rss_mb': get_peak_rss_mb()
+    }
+
+def compute_level_accuracy(rankings: list[list[str]], gold_labels: list[str], leaf_paths: dict, top_k: int) -> dict:
+    """
+    Computes top-1 and top-k accuracy at every level of the category tree.
+
+    A prediction is correct at level N if the N-th ancestor of a predicted leaf equals the N-th
+    ancestor of the expected leaf. Items whose expected leaf has no ancestor at level N are not
+    counted for that level; the 'folha' level compares the leaves themselves.
+
+    Returns:
+        A dictionary like {'top1_folha': 0.8, 'top3_folha': 0.9, 'top1_nivel_1': 0.95, ...}.
+    """
+    max_depth = max(len(path) for path in leaf_paths.values())
+    levels = [(f'nivel_{depth + 1}', depth) for depth in range(max_depth)] + [('folha', None)]
+
+    accuracy = {}
+    for level_name, depth in levels:
+        hits_top1, hits_topk, total = 0, 0, 0
+        for ranking, gold in zip(rankings, gold_labels):
+            if depth is None:
+                expected, predicted = gold, ranking
+            else:
+                if len(leaf_paths[gold]) <= depth:
+                    continue
+                expected = leaf_paths[gold][depth]
+                label_paths = [leaf_paths.get(label, []) for label in ranking]
+                predicted = [path[depth] if len(path) > depth else None for path in label_paths]
+            total += 1
+            hits_top1 += bool(predicted) and predicted[0] == expected
+            hits_topk += expected in predicted[:top_k]
+        accuracy[f'top1_{level_name}'] = hits_top1 / total if total else None
+        accuracy[f'top{top_k}_{level_name}'] = hits_topk / total if total else None
+    return accuracy
+
+def mark_pareto_front(df: pd.DataFrame, quality_column: str, speed_column: str) -> pd.Series:
+    """
+    Flags the configurations that no other configuration beats in both quality and speed.
+    """
+    quality, speed = df[quality_column].to_numpy(), df[speed_column].to_numpy()
+    dominated = [
+        bool(np.any((quality >= q) & (speed >= s) & ((quality > q) | (speed > s))))
+        for q, s in zip(quality, speed)
+    ]
+    return ~pd.Series(dominated, index=df.index)
+
+def main():
+    # --- CONFIGURAÇÃO DOS ARGUMENTOS ---
+    parser = argparse.ArgumentParser(description="Compara velocidade e qualidade das configurações do classificador em um conjunto de avaliação revisado.")
+    parser.add_argument("--seed", action="store_true", help="Cria o conjunto de avaliação a partir de produtos_classificados_folhas.csv para revisão manual e encerra.")
+    parser.add_argument("--eval_csv", type=str, default=None, help="Conjunto de avaliação. Padrão: data/conjunto_avaliacao.csv")
+    parser.add_argument("--models", type=str, nargs='+', default=[MODEL_NAME], help="Modelos zero-shot a comparar (nomes no Hugging Face Hub ou pastas com snapshots locais).")
+    parser.add_argument("--batch_sizes", type=int, nargs='+', default=[1, 8, 32], help="Tamanhos de lote a comparar.")
+    parser.add_argument("--dedup_thresholds", type=float, nargs='*', default=[0.8], help="Limiares de deduplicação a comparar, além da execução sem deduplicação.")
+    parser.add_argument("--top_k", type=int, default=3, help="k da acurácia top-k.")
+    parser.add_argument("--num_samples", type=int, default=None, help="Limita o número de itens avaliados.")
+    parser.add_argument("--offline", action="store_true", help="Não acessa o Hugging Face Hub.")
+    args = parser.parse_args()
+
+    # --- CONFIGURAÇÃO DOS CAMINHOS ---
+    script_dir = os.path.dirname(__file__)
+    json_path = os.path.join(script_dir, 'data', 'categorias_supermercado.json')
+    classified_csv_path = os.path.join(script_dir, 'data', 'produtos_classificados_folhas.csv')
+    eval_csv_path = args.eval_csv or os.path.join(script_dir, 'data', 'conjunto_avaliacao.csv')
+    output_csv_path = os.path.join(script_dir, 'data', 'avaliacao_motores.csv')
+
+    if args.seed:
+        seed_evaluation_set(classified_csv_path, eval_csv_path)
+        return
+
+    # 1. Carregar a árvore de categorias e o conjunto de avaliação
+    with open(json_path, 'r', encoding='utf-8') as f:
+        category_tree = json.load(f)
+    leaf_labels = get_leaf_nodes(category_tree)
+    leaf_paths = get_leaf_paths(category_tree)
+
+    if not os.path.exists(eval_csv_path):
+        print(f"Erro: conjunto de avaliação não encontrado em '{eval_csv_path}'. Crie-o com --seed e revise-o.")
+        return
+
+    eval_df = load_evaluation_set(eval_csv_path, leaf_paths)
+    if args.num_samples:
+        eval_df = eval_df.sample(n=min(args.num_samples, len(eval_df)), random_state=42)
+    if eval_df.empty:
+        print("Erro: nenhuma linha revisada no conjunto de avaliação (coluna 'revisado').")
+        return
+
+    names = eval_df['produto_original'].tolist()
+    gold_labels = eval_df['categoria_correta'].tolist()
+    print(f"{len(names)} itens revisados no conjunto de avaliação.")
+
+    # 2. Executar cada configuração em um processo novo
+    configurations = build_configurations(args.models, args.batch_sizes, args.dedup_thresholds)
+    context = multiprocessing.get_context('spawn')
+
+    rows = []
+    for config in configurations:
+        name = configuration_name(config)
+        print(f"Avaliando: {name}...")
+        with context.Pool(processes=1) as pool:
+            run = pool.apply(run_configuration, (config, names, leaf_labels, args.top_k, args.offline))
+
+        latencies_ms = np.array(run['latencias']) * 1000
+        rows.append({
+            'configuracao': name,
+            'itens_por_s': len(names) / run['segundos'],
+            'chamadas_modelo': run['chamadas_modelo'],
+            'latencia_p50_ms': np.percentile(latencies_ms, 50),
+            'latencia_p95_ms': np.percentile(latencies_ms, 95),
+            'latencia_p99_ms': np.percentile(latencies_ms, 99),
+            'pico_rss_mb': run['pico_rss_mb'],
+            **compute_level_accuracy(run['rankings'], gold_labels, leaf_paths, args.top_k)
+        })
+
+    # 3. Montar a tabela de Pareto (acurácia top-1 da folha x itens/s)
+    results_df = pd.DataFrame(rows)
+    results_df['pareto'] = mark_pareto_front(results_df, 'top1_folha', 'itens_por_s')
+    results_df = results_df.sort_values(by=['pareto', 'top1_folha', 'itens_por_s'], ascending=False)
+
+    print()
+    print(results_df.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    results_df.to_csv(output_csv_path, index=False, encoding='utf-8')
+    print(f"\nResultados salvos em '{output_csv_path}'.")
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,13 @@
 import pandas as pd
-from transformers import pipeline
 import os
 import re
+import argparse
 from src.text_cleaner import clean_text
+from src.profiling import RunProfiler, instrument_pipeline
+from src.model_loading import load_pipeline
 
-def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str, product_name_column: str, num_samples: int = None):
+def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str, product_name_column: str, num_samples: int = None, profiler: RunProfiler = None,
+                                     model: str = 'google/flan-t5-base', model_path: str = None, offline: bool = False):
     """
     Generates hierarchical categories for products from a CSV file using a text generation model.
 
@@ -13,15 +16,18 @@ def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str,
         output_csv_path (str): Path to save the output CSV file with generated categories.
         product_name_column (str): Name of the column with product names.
         num_samples (int, optional): Number of products to process. If None, processes all. Defaults to None.
+        profiler (RunProfiler, optional): Collects per-stage timings and progress. Defaults to a disabled profiler.
+        model (str, optional): Model name on the Hugging Face Hub. Defaults to 'google/flan-t5-base'.
+        model_path (str, optional): Local model snapshot directory, used instead of model. Defaults to None.
+        offline (bool, optional): If True, never contacts the Hugging Face Hub. Defaults to False.
     """
-    # 1. Carregar o modelo de geração de texto
-    print("Carregando o modelo de geração de texto...")
-    generator = pipeline('text2text-generation', model='google/flan-t5-base')
+    profiler = profiler or RunProfiler()
 
-    # 2. Ler o CSV com os produtos
+    # 1. Ler o CSV com os produtos
     print(f"Lendo produtos de '{input_csv_path}'...")
     try:
-        df = pd.read_csv(input_csv_path)
+        with profiler.stage('leitura_csv'):
+            df = pd.read_csv(input_csv_path)
     except FileNotFoundError:
         print(f"Erro: Arquivo de entrada não encontrado em '{input_csv_path}'")
         return
@@ -36,12 +42,20 @@ def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str,
     
     product_names = product_names.tolist()
 
+    # 2. Carregar o modelo de geração de texto (só depois de validar a entrada)
+    print("Carregando o modelo de geração de texto...")
+    with profiler.stage('carregamento_modelo'):
+        generator = load_pipeline('text2text-generation', model=model, model_path=model_path, offline=offline)
+    instrument_pipeline(generator, profiler)
+
     # 3. Gerar categorias para cada produto
     print(f"Gerando categorias para {len(product_names)} produtos")
     
     results = []
-    for i, name in enumerate(product_names):
-        cleaned_name = clean_text(name)
+    profiler.start_loop(len(product_names))
+    for name in product_names:
+        with profiler.stage('limpeza'):
+            cleaned_name = clean_text(name)
 
         # Montar o prompt para o modelo
         prompt = f"""
@@ -67,7 +81,6 @@ def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str,
                 'categorias_geradas': categories_str,
                 'texto_gerado_completo': generated_text
             })
-            print(f"({i+1}/{len(product_names)}) Produto: {name} -> Categorias: {categories_str}")
 
         except Exception as e:
             print(f"Erro ao processar o produto '{name}': {e}")
@@ -77,22 +90,35 @@ def generate_hierarchical_categories(input_csv_path: str, output_csv_path: str,
                 'categorias_geradas': 'erro',
                 'texto_gerado_completo': str(e)
             })
+        profiler.step()
 
 
     # 4. Salvar os resultados
     results_df = pd.DataFrame(results)
     print(f"Salvando os resultados em '{output_csv_path}'...")
-    results_df.to_csv(output_csv_path, index=False, encoding='utf-8')
+    with profiler.stage('escrita_csv'):
+        results_df.to_csv(output_csv_path, index=False, encoding='utf-8')
     print("Geração de categorias concluída!")
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera categorias hierárquicas para produtos usando um modelo de geração de texto.")
+    parser.add_argument("--num_samples", type=int, default=20, help="Número de produtos a processar. Use 0 para processar todos.")
+    parser.add_argument("--profile", action="store_true", help="Mede o tempo de cada etapa, tokens por passagem forward e pico de memória, e salva um relatório JSON da execução.")
+    parser.add_argument("--profile_sampler", action="store_true", help="Junto com --profile, executa um profiler de amostragem (pyinstrument, se instalado) durante a geração.")
+    parser.add_argument("--model", type=str, default="google/flan-t5-base", help="Nome do modelo de geração de texto no Hugging Face Hub.")
+    parser.add_argument("--model_path", type=str, default=None, help="Pasta com um snapshot local do modelo (ver src/model_loading.py). Tem prioridade sobre --model.")
+    parser.add_argument("--offline", action="store_true", help="Não acessa o Hugging Face Hub; o modelo deve estar em --model_path ou no cache local.")
+    args = parser.parse_args()
+
     # --- CONFIGURAÇÃO ---
     script_dir = os.path.dirname(__file__)
     input_file = os.path.join(script_dir, 'data', 'produtos_carrefour.csv')
     output_file = os.path.join(script_dir, 'data', 'produtos_com_categorias_geradas.csv')
+    report_file = os.path.join(script_dir, 'data', 'relatorio_generate_categories.json')
     coluna_produto = 'nome'
 
-    numero_de_amostras = 20
-
-    generate_hierarchical_categories(input_file, output_file, coluna_produto, num_samples=numero_de_amostras)
+    profiler = RunProfiler(enabled=args.profile, report_path=report_file, sampler=args.profile_sampler)
+    generate_hierarchical_categories(input_file, output_file, coluna_produto, num_samples=args.num_samples or None, profiler=profiler,
+                                     model=args.model, model_path=args.model_path, offline=args.offline)
+    profiler.finish(extra={'script': 'generate_categories', 'argumentos': vars(args)})
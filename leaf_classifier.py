@@ -1,11 +1,16 @@
 
 import json
 import pandas as pd
-from transformers import pipeline
 from src.text_cleaner import clean_text
+from src.dedup import group_near_duplicates
+from src.profiling import RunProfiler, instrument_pipeline
+from src.model_loading import load_pipeline
 import os
 import argparse
 
+MODEL_NAME = "joeddav/xlm-roberta-large-xnli"
+HYPOTHESIS_TEMPLATE = "A categoria para este produto é {}."
+
 def get_leaf_nodes(node):
     """
     Recursively traverses the category tree and returns a flat list of all unique leaf node strings.
@@ -19,10 +24,52 @@ def get_leaf_nodes(node):
     
     return list(set(leaves))
 
+def get_leaf_paths(node, path=None):
+    """
+    Recursively traverses the category tree and maps each leaf to the list of its ancestors (from the root).
+    Leaves that appear under more than one branch keep the first path found.
+    """
+    path = path or []
+    paths = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            for leaf, leaf_path in get_leaf_paths(value, path + [key]).items():
+                paths.setdefault(leaf, leaf_path)
+    elif isinstance(node, list):
+        for leaf in node:
+            paths.setdefault(leaf, path)
+
+    return paths
+
+def classify_names(classifier, names, leaf_labels, batch_size=1, profiler=None):
+    """
+    Classifies cleaned product names against the leaf labels, batch_size names per pipeline call.
+    The batch size is also passed to the pipeline, which batches the (name, label) pairs of the forward pass.
+
+    Returns a list with one classification per name, with 'labels' and 'scores' sorted by score.
+    """
+    classifications = []
+    for start in range(0, len(names), batch_size):
+        chunk = names[start:start + batch_size]
+        output = classifier(chunk, leaf_labels, multi_label=False, batch_size=batch_size)
+        classifications.extend([output] if isinstance(output, dict) else output)
+        if profiler is not None:
+            profiler.step(len(chunk))
+
+    return classifications
+
 def main():
     # --- CONFIGURAÇÃO DOS ARGUMENTOS ---
     parser = argparse.ArgumentParser(description="Classifica produtos de um arquivo CSV usando um modelo zero-shot.")
     parser.add_argument("--num_samples", type=int, default=None, help="Número de amostras para classificar. Se não for fornecido, classifica todos os produtos.")
+    parser.add_argument("--dedup", action="store_true", help="Agrupa nomes quase idênticos (MinHash/LSH) e classifica apenas um representante por grupo.")
+    parser.add_argument("--dedup_threshold", type=float, default=0.8, help="Similaridade de Jaccard mínima para considerar dois nomes duplicados.")
+    parser.add_argument("--profile", action="store_true", help="Mede o tempo de cada etapa, tokens por passagem forward e pico de memória, e salva um relatório JSON da execução.")
+    parser.add_argument("--profile_sampler", action="store_true", help="Junto com --profile, executa um profiler de amostragem (pyinstrument, se instalado) durante a classificação.")
+    parser.add_argument("--batch_size", type=int, default=1, help="Número de produtos (e de pares produto/categoria no forward) processados por chamada ao modelo.")
+    parser.add_argument("--model", type=str, default=MODEL_NAME, help="Nome do modelo zero-shot no Hugging Face Hub.")
+    parser.add_argument("--model_path", type=str, default=None, help="Pasta com um snapshot local do modelo (ver src/model_loading.py). Tem prioridade sobre --model.")
+    parser.add_argument("--offline", action="store_true", help="Não acessa o Hugging Face Hub; o modelo deve estar em --model_path ou no cache local.")
     args = parser.parse_args()
 
     # --- CONFIGURAÇÃO DOS CAMINHOS ---
@@ -30,8 +77,11 @@ def main():
     json_path = os.path.join(script_dir, 'data', 'categorias_supermercado.json')
     products_csv_path = os.path.join(script_dir, 'data', 'produtos_carrefour.csv')
     output_csv_path = os.path.join(script_dir, 'data', 'produtos_classificados_folhas.csv')
+    report_path = os.path.join(script_dir, 'data', 'relatorio_leaf_classifier.json')
     product_name_column = 'nome'
 
+    profiler = RunProfiler(enabled=args.profile, report_path=report_path, sampler=args.profile_sampler)
+
     # 1. Carregar a árvore de categorias e extrair apenas as folhas
     print(f"Carregando árvore de categorias de '{json_path}'...")
     with open(json_path, 'r', encoding='utf-8') as f:
@@ -41,17 +91,10 @@ def main():
     leaf_labels = get_leaf_nodes(category_tree)
     print(f"{len(leaf_labels)} etiquetas de folhas únicas extraídas.")
 
-    # 2. Carregar o modelo de classificação
-    print("Carregando o modelo de classificação zero-shot...")
-    classifier = pipeline(
-        "zero-shot-classification",
-        model="joeddav/xlm-roberta-large-xnli",
-        hypothesis_template="A categoria para este produto é {}."
-    )
-
-    # 3. Ler o CSV de produtos e aplicar amostragem se necessário
+    # 2. Ler o CSV de produtos e aplicar amostragem se necessário
     print(f"Lendo produtos de '{products_csv_path}'...")
-    df = pd.read_csv(products_csv_path)
+    with profiler.stage('leitura_csv'):
+        df = pd.read_csv(products_csv_path)
     df.dropna(subset=[product_name_column], inplace=True)
 
     if args.num_samples:
@@ -61,36 +104,69 @@ def main():
         print("Processando todos os produtos do arquivo...")
         product_sample = df
 
-    # 4. Classificar cada produto da amostra em um loop
-    print(f"Iniciando classificação para {len(product_sample)} produtos usando apenas as folhas...")
-    
-    results = []
-    for index, row in product_sample.iterrows():
-        original_name = row[product_name_column]
-        cleaned_name = clean_text(original_name)
+    # 3. Agrupar nomes quase duplicados (opcional)
+    original_names = product_sample[product_name_column].tolist()
+    with profiler.stage('limpeza'):
+        cleaned_names = [clean_text(name) for name in original_names]
+
+    if args.dedup:
+        print(f"Agrupando nomes quase duplicados (limiar de Jaccard: {args.dedup_threshold})...")
+        with profiler.stage('dedup'):
+            group_ids = group_near_duplicates(original_names, threshold=args.dedup_threshold)
+    else:
+        group_ids = list(range(len(cleaned_names)))
+
+    num_groups = len(set(group_ids))
+    print(f"{num_groups} grupos para {len(cleaned_names)} produtos ({len(cleaned_names) - num_groups} chamadas ao modelo evitadas).")
+
+    # 4. Carregar o modelo de classificação (apenas se houver algo a classificar)
+    if num_groups > 0:
+        print("Carregando o modelo de classificação zero-shot...")
+        with profiler.stage('carregamento_modelo'):
+            classifier = load_pipeline(
+                "zero-shot-classification",
+                model=args.model,
+                model_path=args.model_path,
+                offline=args.offline,
+                hypothesis_template=HYPOTHESIS_TEMPLATE
+            )
+        instrument_pipeline(classifier, profiler)
 
-        print(f"\nProcessando: '{original_name}'...")
+    # 5. Classificar um representante de cada grupo em um loop
+    print(f"Iniciando classificação para {num_groups} produtos usando apenas as folhas...")
 
-        # Classifica um produto de cada vez contra a lista de folhas
-        classification = classifier(cleaned_name, leaf_labels, multi_label=False)
-        
-        best_label = classification['labels'][0]
-        best_score = classification['scores'][0]
+    representatives = {}
+    for cleaned_name, group_id in zip(cleaned_names, group_ids):
+        representatives.setdefault(group_id, cleaned_name)
 
-        print(f"--> Classificado como: {best_label} (Confiança: {best_score:.2f})")
+    profiler.start_loop(num_groups)
+    classifications = classify_names(classifier, list(representatives.values()), leaf_labels, args.batch_size, profiler) if num_groups > 0 else []
 
+    group_results = {
+        group_id: (classification['labels'][0], classification['scores'][0])
+        for group_id, classification in zip(representatives, classifications)
+    }
+
+    # O rótulo do representante é propagado para todos os membros do grupo
+    results = []
+    for original_name, cleaned_name, group_id in zip(original_names, cleaned_names, group_ids):
+        best_label, best_score = group_results[group_id]
         results.append({
             'produto_original': original_name,
             'produto_limpo': cleaned_name,
             'categoria_folha': best_label,
-            'confianca': best_score
+            'confianca': best_score,
+            'grupo_id': group_id
         })
 
-    # 5. Salvar os resultados
+    # 6. Salvar os resultados
     results_df = pd.DataFrame(results)
     print(f"\nSalvando os resultados em '{output_csv_path}'...")
-    results_df.to_csv(output_csv_path, index=False, encoding='utf-8')
+    with profiler.stage('escrita_csv'):
+        results_df.to_csv(output_csv_path, index=False, encoding='utf-8')
     print("Classificação concluída com sucesso!")
 
+    profiler.finish(extra={'script': 'leaf_classifier', 'argumentos': vars(args), 'produtos': len(results), 'chamadas_modelo': num_groups})
+
 if __name__ == '__main__':
     main()
@@ -1,10 +1,29 @@
 import pandas as pd
 import numpy as np
-from src.embedding_utils import generate_embedding
+import argparse
+from src.embedding_utils import generate_embedding, get_model
 from src.text_cleaner import clean_text
 import os
 
-def generate_product_embeddings(input_csv_path: str, output_csv_path: str, product_name_column: str):
+def prepare_text_for_embedding(cleaned_product_name: str) -> str:
+    """
+    Emphasizes the first words of a cleaned product name (usually the product type) before embedding it.
+
+    Args:
+        cleaned_product_name: The product name after clean_text.
+
+    Returns:
+        The text to be passed to generate_embedding.
+    """
+    words = cleaned_product_name.split()
+    if len(words) > 0:
+        # Take the first 2 words and repeat them 3 times
+        emphasized_part = " ".join(words[:2])
+        return f"{emphasized_part} {emphasized_part} {emphasized_part} {cleaned_product_name}"
+    return cleaned_product_name
+
+def generate_product_embeddings(input_csv_path: str, output_csv_path: str, product_name_column: str,
+                                model_path: str = None, offline: bool = False):
     """
     Reads product names from an input CSV, generates embeddings for each, and saves
     the product name and its embedding to an output CSV.
@@ -13,6 +32,8 @@ def generate_product_embeddings(input_csv_path: str, output_csv_path: str, produ
         input_csv_path: Path to the input CSV file containing product names.
         output_csv_path: Path where the output CSV with embeddings will be saved.
         product_name_column: The name of the column in the input CSV containing product names.
+        model_path: Local snapshot directory of the embedding model (see src/embedding_utils.get_model).
+        offline: If True, never contacts the Hugging Face Hub.
     """
     print(f"Reading product data from: {input_csv_path}")
     try:
@@ -28,6 +49,8 @@ def generate_product_embeddings(input_csv_path: str, output_csv_path: str, produ
         print(f"Error: Column '{product_name_column}' not found in the input CSV.")
         return
 
+    get_model(model_path, offline)
+
     embeddings_data = []
     total_products = len(df)
     print(f"Generating embeddings for {total_products} products...")
@@ -36,14 +59,7 @@ def generate_product_embeddings(input_csv_path: str, output_csv_path: str, produ
         original_product_name = str(row[product_name_column])
         cleaned_product_name = clean_text(original_product_name)
 
-        words = cleaned_product_name.split()
-        if len(words) > 0:
-            # Take the first 2 words and repeat them 3 times
-            emphasized_part = " ".join(words[:2])
-            processed_text_for_embedding = f"{emphasized_part} {emphasized_part} {emphasized_part} {cleaned_product_name}"
-        else:
-            processed_text_for_embedding = cleaned_product_name
-
+        processed_text_for_embedding = prepare_text_for_embedding(cleaned_product_name)
         embedding = generate_embedding(processed_text_for_embedding)
         embeddings_data.append({
             'nome': original_product_name,
@@ -67,8 +83,15 @@ if __name__ == '__main__':
     script_dir = os.path.dirname(__file__)
     input_csv = os.path.join(script_dir, 'data', 'produtos_carrefour.csv')
     output_csv = os.path.join(script_dir, 'data', 'product_embeddings.csv')
-    product_col = 'nome'
+
+    parser = argparse.ArgumentParser(description="Generates the embeddings of the product names.")
+    parser.add_argument("--input", type=str, default=input_csv, help="CSV with the product names.")
+    parser.add_argument("--output", type=str, default=output_csv, help="Output CSV with the embeddings.")
+    parser.add_argument("--column", type=str, default='nome', help="Product name column of --input.")
+    parser.add_argument("--model_path", type=str, default=None, help="Local snapshot directory of the embedding model. Defaults to EMBEDDING_MODEL_PATH or the Hugging Face Hub.")
+    parser.add_argument("--offline", action="store_true", help="Never contacts the Hugging Face Hub; the model must be in --model_path or in the local cache.")
+    args = parser.parse_args()
 
     print("Starting embedding generation script...")
-    generate_product_embeddings(input_csv, output_csv, product_col)
+    generate_product_embeddings(args.input, args.output, args.column, model_path=args.model_path, offline=args.offline)
     print("Script finished.")
@@ -4,6 +4,18 @@ from scipy.cluster.hierarchy import linkage, fcluster
 import os
 import ast 
 
+def load_embeddings(df: pd.DataFrame) -> np.ndarray:
+    """
+    Parses the 'embedding' column (stored as list literals) into a 2D array.
+
+    Args:
+        df (pd.DataFrame): DataFrame read from the embeddings CSV.
+
+    Returns:
+        np.ndarray: An array of shape (n_products, embedding_dim).
+    """
+    return np.array([ast.literal_eval(e) for e in df['embedding']])
+
 def perform_hierarchical_clustering_multi_level(input_embeddings_csv_path: str, output_clusters_csv_path: str, thresholds: list[float]):
     """
     Performs hierarchical clustering on product embeddings and generates multiple levels of flat clusters.
@@ -28,7 +40,7 @@ def perform_hierarchical_clustering_multi_level(input_embeddings_csv_path: str,
         print("Error: Input CSV must contain 'nome' and 'embedding' columns.")
         return
 
-    embeddings = np.array([ast.literal_eval(e) for e in df['embedding']])
+    embeddings = load_embeddings(df)
 
     print(f"Loaded {len(embeddings)} embeddings. Performing hierarchical clustering with {len(thresholds)} levels...")
 
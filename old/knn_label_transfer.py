@@ -0,0 +1,138 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+from src.ann_index import IVFIndex
+from src.text_cleaner import clean_text
+from hierarchical_clustering import load_embeddings
+
+def load_labelled_embeddings(embeddings_csv_path: str, labels_csv_path: str = None):
+    """
+    Reads product embeddings and attaches the 'categoria_folha' of each product, when known.
+
+    Args:
+        embeddings_csv_path: CSV written by generate_product_embeddings.py ('nome' and 'embedding' columns).
+        labels_csv_path: CSV with 'produto_original' and 'categoria_folha' columns (e.g. the
+                         output of leaf_classifier.py). Products without a label get ''.
+
+    Returns:
+        A tuple (vectors, ids, labels).
+    """
+    df = pd.read_csv(embeddings_csv_path)
+    if 'nome' not in df.columns or 'embedding' not in df.columns:
+        raise ValueError("Input CSV must contain 'nome' and 'embedding' columns.")
+
+    labels = pd.Series('', index=df.index)
+    if labels_csv_path:
+        labels_df = pd.read_csv(labels_csv_path).drop_duplicates(subset='produto_original')
+        label_by_name = labels_df.set_index('produto_original')['categoria_folha']
+        labels = df['nome'].map(label_by_name).fillna('')
+
+    return load_embeddings(df), df['nome'].astype(str).tolist(), labels.tolist()
+
+def build_index(embeddings_csv_path: str, labels_csv_path: str, index_path: str, n_probe: int = 16):
+    """
+    Builds an IVF index over all product embeddings and saves it.
+    """
+    print(f"Reading embeddings from: {embeddings_csv_path}")
+    vectors, ids, labels = load_labelled_embeddings(embeddings_csv_path, labels_csv_path)
+    print(f"Building index over {len(ids)} products ({sum(1 for label in labels if label)} labelled)...")
+
+    index = IVFIndex(n_probe=n_probe).build(vectors, ids, labels)
+    index.save(index_path)
+    print(f"Index with {len(index.centroids)} lists saved to: {index_path}")
+
+def add_to_index(embeddings_csv_path: str, labels_csv_path: str, index_path: str):
+    """
+    Inserts the products of an embeddings CSV that are not yet in the index (e.g. new SKUs from the crawler)
+    and updates the labels of products already indexed (e.g. labelled by leaf_classifier.py after the build).
+    """
+    index = IVFIndex.load(index_path)
+    vectors, ids, labels = load_labelled_embeddings(embeddings_csv_path, labels_csv_path)
+
+    known = set(index.ids)
+    new_rows = [i for i, product_id in enumerate(ids) if product_id not in known]
+    known_rows = [i for i, product_id in enumerate(ids) if product_id in known]
+    relabelled = index.set_labels([ids[i] for i in known_rows], [labels[i] for i in known_rows])
+    if not new_rows and not relabelled:
+        print("No new products or labels to add.")
+        return
+
+    if new_rows:
+        index.add(vectors[new_rows], [ids[i] for i in new_rows], [labels[i] for i in new_rows])
+    index.save(index_path)
+    print(f"Added {len(new_rows)} products and updated {relabelled} labels. Index now has {len(index)} products.")
+
+def classify_products(input_csv_path: str, output_csv_path: str, index_path: str, product_name_column: str, k: int = 10,
+                      model_path: str = None, offline: bool = False):
+    """
+    Classifies product names (e.g. NFe lines) by the weighted vote of their k nearest labelled products.
+
+    Args:
+        input_csv_path: CSV with the product names to classify.
+        output_csv_path: Path where the classified products will be saved.
+        index_path: Index saved by build_index.
+        product_name_column: Name of the column with the product names.
+        k: Number of neighbours consulted.
+        model_path: Local snapshot directory of the embedding model (see src/embedding_utils.get_model).
+        offline: If True, never contacts the Hugging Face Hub.
+    """
+    # Importado aqui para que build/add não carreguem o modelo de embeddings
+    from src.embedding_utils import generate_embedding, get_model
+    from generate_product_embeddings import prepare_text_for_embedding
+
+    index = IVFIndex.load(index_path)
+    df = pd.read_csv(input_csv_path)
+    if product_name_column not in df.columns:
+        print(f"Error: Column '{product_name_column}' not found in the input CSV.")
+        return
+
+    get_model(model_path, offline)
+
+    results = []
+    names = df[product_name_column].dropna().astype(str).tolist()
+    print(f"Classifying {len(names)} products with k={k}...")
+    for name in names:
+        cleaned_name = clean_text(name)
+        embedding = generate_embedding(prepare_text_for_embedding(cleaned_name))
+        label, confidence, neighbours = index.classify(np.asarray(embedding), k=k)
+        results.append({
+            'produto_original': name,
+            'produto_limpo': cleaned_name,
+            'categoria_folha': label,
+            'confianca': confidence,
+            'num_vizinhos': len(neighbours),
+            'vizinhos': '; '.join(neighbours)
+        })
+
+    pd.DataFrame(results).to_csv(output_csv_path, index=False, encoding='utf-8')
+    print(f"Classified products saved to: {output_csv_path}")
+
+if __name__ == '__main__':
+    script_dir = os.path.dirname(__file__)
+    embeddings_csv = os.path.join(script_dir, 'data', 'product_embeddings.csv')
+    labels_csv = os.path.join(script_dir, '..', 'data', 'produtos_classificados_folhas.csv')
+    index_file = os.path.join(script_dir, 'data', 'product_index.npz')
+
+    parser = argparse.ArgumentParser(description="k-NN label transfer over an approximate nearest-neighbour index of product embeddings.")
+    parser.add_argument("mode", choices=['build', 'add', 'classify'], help="build: creates the index; add: inserts new products and updates labels; classify: labels the products of --input.")
+    parser.add_argument("--embeddings", type=str, default=embeddings_csv, help="Embeddings CSV (build/add).")
+    parser.add_argument("--labels", type=str, default=labels_csv, help="CSV with 'produto_original' and 'categoria_folha' (build/add).")
+    parser.add_argument("--index", type=str, default=index_file, help="Index file (.npz).")
+    parser.add_argument("--input", type=str, default=None, help="CSV with the products to classify (classify).")
+    parser.add_argument("--output", type=str, default=os.path.join(script_dir, 'data', 'produtos_classificados_knn.csv'), help="Output CSV (classify).")
+    parser.add_argument("--column", type=str, default='nome', help="Product name column of --input.")
+    parser.add_argument("--k", type=int, default=10, help="Number of neighbours consulted.")
+    parser.add_argument("--n_probe", type=int, default=16, help="Number of inverted lists scanned per query (build).")
+    parser.add_argument("--model_path", type=str, default=None, help="Local snapshot directory of the embedding model (classify). Defaults to EMBEDDING_MODEL_PATH or the Hugging Face Hub.")
+    parser.add_argument("--offline", action="store_true", help="Never contacts the Hugging Face Hub (classify); the model must be in --model_path or in the local cache.")
+    args = parser.parse_args()
+
+    if args.mode == 'build':
+        build_index(args.embeddings, args.labels, args.index, n_probe=args.n_probe)
+    elif args.mode == 'add':
+        add_to_index(args.embeddings, args.labels, args.index)
+    elif args.input is None:
+        print("Error: classify requires --input.")
+    else:
+        classify_products(args.input, args.output, args.index, args.column, k=args.k, model_path=args.model_path, offline=args.offline)
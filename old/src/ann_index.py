@@ -0,0 +1,293 @@
+import numpy as np
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalizes vectors (rows), so that the dot product equals the cosine similarity.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 42) -> np.ndarray:
+    """
+    Clusters normalized vectors by cosine similarity and returns the normalized centroids.
+
+    Args:
+        vectors: Normalized vectors, shape (n, dim).
+        n_clusters: Number of centroids.
+        n_iter: Number of assignment/update iterations.
+        seed: Seed for the initial centroids.
+
+    Returns:
+        An array of shape (n_clusters, dim).
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+
+        # Centróides vazios são reiniciados em pontos aleatórios
+        empty = counts == 0
+        sums[empty] = vectors[rng.choice(len(vectors), size=empty.sum())]
+        centroids = normalize(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) approximate nearest-neighbour index over cosine similarity.
+
+    Vectors are partitioned by their closest centroid; a query only scans the `n_probe` lists whose
+    centroids are closest to it. The scan uses PCA-reduced copies of the vectors (a fraction of the
+    memory traffic of the full embeddings) and the best `rerank` candidates are re-scored exactly.
+    The reduced vectors of all lists live in one array, grouped by list, so each probed list is a slice.
+
+    Each indexed item has an id (e.g. the product name) and an optional label (e.g. its
+    'categoria_folha'); items with an empty label are indexed but skipped by classify().
+    """
+
+    def __init__(self, n_probe: int = 16, rerank: int = 100):
+        self.n_probe = n_probe
+        self.rerank = rerank
+        self.mean = None
+        self.projection = None
+        self.centroids = None
+        self.vectors = None
+        self.ids = []
+        self.labels = []
+        self.labelled = np.empty(0, dtype=bool)
+        self.codes = None
+        self.code_rows = None
+        self.list_offsets = None
+        self.list_labelled = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        # Produto escalar no espaço reduzido aproxima q . (x - mean), que ordena os vizinhos como q . x
+        return (vectors - self.mean) @ self.projection
+
+    def build(self, vectors: np.ndarray, ids: list[str], labels: list[str] = None, n_lists: int = None,
+              n_components: int = 128, n_iter: int = 10, train_size: int = 32, seed: int = 42) -> 'IVFIndex':
+        """
+        Trains the PCA projection and the centroids, then indexes the given vectors, replacing any previous content.
+
+        Args:
+            vectors: Embeddings, shape (n, dim). They are normalized internally.
+            ids: One identifier per vector.
+            labels: One label per vector ('' for unlabelled items). Defaults to no labels.
+            n_lists: Number of inverted lists. Defaults to 4 * sqrt(n).
+            n_components: Dimension of the reduced vectors scanned at query time (capped at dim).
+            n_iter: Number of k-means iterations.
+            train_size: PCA and k-means are trained on at most n_lists * train_size vectors.
+            seed: Seed for sampling and centroid initialization.
+
+        Returns:
+            The index itself.
+        """
+        vectors = normalize(vectors)
+        n_lists = n_lists or max(1, int(4 * np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), n_lists * train_size)
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+
+        self.mean = sample.mean(axis=0)
+        _, _, components = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.projection = np.ascontiguousarray(components[:n_components].T)
+
+        self.centroids = self._encode(spherical_kmeans(sample, n_lists, n_iter=n_iter, seed=seed))
+        self.vectors = np.empty((0, vectors.shape[1]), dtype=np.float32)
+        self.ids, self.labels = [], []
+        self.labelled = np.empty(0, dtype=bool)
+        self._reset_lists()
+        return self.add(vectors, ids, labels)
+
+    def add(self, vectors: np.ndarray, ids: list[str], labels: list[str] = None) -> 'IVFIndex':
+        """
+        Inserts new vectors into the existing lists, without retraining the projection or the centroids.
+
+        Args:
+            vectors: Embeddings, shape (n, dim).
+            ids: One identifier per vector.
+            labels: One label per vector ('' for unlabelled items). Defaults to no labels.
+
+        Returns:
+            The index itself.
+        """
+        if self.centroids is None:
+            raise ValueError("The index has not been built: call build() before add().")
+
+        vectors = normalize(vectors)
+        labels = labels if labels is not None else [''] * len(ids)
+        rows = np.arange(len(self.ids), len(self.ids) + len(ids))
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.ids.extend(ids)
+        labels = ['' if label is None else str(label) for label in labels]
+        self.labels.extend(labels)
+        self.labelled = np.concatenate([self.labelled, np.array([bool(label) for label in labels], dtype=bool)])
+        self._assign(self._encode(vectors), rows)
+        return self
+
+    def set_labels(self, ids: list[str], labels: list[str]) -> int:
+        """
+        Updates the labels of items already in the index (e.g. products labelled after being indexed).
+        Empty labels and unknown ids are ignored, so existing labels are never erased.
+
+        Returns:
+            The number of items whose label changed.
+        """
+        row_by_id = {product_id: row for row, product_id in enumerate(self.ids)}
+        changed = 0
+        for product_id, label in zip(ids, labels):
+            row = row_by_id.get(product_id)
+            label = '' if label is None else str(label)
+            if row is not None and label and self.labels[row] != label:
+                self.labels[row] = label
+                self.labelled[row] = True
+                changed += 1
+
+        if changed:
+            self._count_labelled()
+        return changed
+
+    def _reset_lists(self) -> None:
+        self.codes = np.empty((0, self.projection.shape[1]), dtype=np.float32)
+        self.code_rows = np.empty(0, dtype=np.int64)
+        self.list_offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        self.list_labelled = np.zeros(len(self.centroids), dtype=np.int64)
+
+    def _assign(self, codes: np.ndarray, rows: np.ndarray) -> None:
+        n_lists = len(self.centroids)
+        current_lists = np.repeat(np.arange(n_lists), np.diff(self.list_offsets))
+        list_ids = np.concatenate([current_lists, np.argmax(codes @ self.centroids.T, axis=1)])
+
+        # Reagrupa tudo por lista (ordenação estável), para que cada lista seja uma fatia contígua
+        order = np.argsort(list_ids, kind='stable')
+        self.codes = np.ascontiguousarray(np.vstack([self.codes, codes])[order], dtype=np.float32)
+        self.code_rows = np.concatenate([self.code_rows, rows])[order]
+        sizes = np.bincount(list_ids, minlength=n_lists)
+        self.list_offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self._count_labelled()
+
+    def _count_labelled(self) -> None:
+        list_ids = np.repeat(np.arange(len(self.centroids)), np.diff(self.list_offsets))
+        self.list_labelled = np.bincount(list_ids, weights=self.labelled[self.code_rows], minlength=len(self.centroids)).astype(np.int64)
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: int = None,
+               labelled_only: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the approximate k nearest neighbours of a single query vector.
+
+        Args:
+            query: Query embedding, shape (dim,).
+            k: Number of neighbours.
+            n_probe: Number of lists to scan. Defaults to the index's n_probe.
+            labelled_only: Only return labelled items. If the n_probe closest lists hold fewer than k
+                           of them, more lists are scanned until k are reached or every list is.
+
+        Returns:
+            The row numbers of the neighbours (see ids/labels) and their cosine similarities, best first.
+        """
+        query = normalize(query)
+        code = (query @ self.projection).astype(np.float32, copy=False)
+        order = np.argsort(-(self.centroids @ code))
+        sizes = np.diff(self.list_offsets)
+
+        n_probe = min(n_probe or self.n_probe, len(order))
+        available = np.cumsum((self.list_labelled if labelled_only else sizes)[order])
+        if available[n_probe - 1] < k:
+            n_probe = min(int(np.searchsorted(available, k)) + 1, len(order))
+
+        probe = order[:n_probe]
+        starts, lengths = self.list_offsets[probe], sizes[probe]
+        ends = np.cumsum(lengths)
+
+        # Cada lista é uma fatia de self.codes: os escores são escritos direto no buffer, sem concatenar as listas
+        approximate_scores = np.empty(ends[-1], dtype=np.float32)
+        for start, length, end in zip(starts, lengths, ends):
+            np.dot(self.codes[start:start + length], code, out=approximate_scores[end - length:end])
+        candidates = self.code_rows[np.repeat(starts - (ends - lengths), lengths) + np.arange(ends[-1])]
+
+        if labelled_only:
+            mask = self.labelled[candidates]
+            candidates, approximate_scores = candidates[mask], approximate_scores[mask]
+        candidates, _ = self._top_k(candidates, approximate_scores, max(k, self.rerank))
+
+        return self._top_k(candidates, self.vectors[candidates] @ query, k)
+
+    def search_exact(self, query: np.ndarray, k: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Brute-force search over every indexed vector. Used as the reference for recall measurements.
+        """
+        return self._top_k(np.arange(len(self.vectors)), self.vectors @ normalize(query), k)
+
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(scores))
+        if k == 0:
+            return rows[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    def classify(self, query: np.ndarray, k: int = 10) -> tuple[str, float, list[str]]:
+        """
+        Classifies a query by the similarity-weighted vote of its k nearest labelled neighbours.
+
+        Returns:
+            The winning label ('' if the index has no labelled item), its share of the total weight
+            of the neighbours, and the ids of the neighbours that voted (k unless fewer items are labelled).
+        """
+        rows, scores = self.search(query, k, labelled_only=True)
+        weights = np.maximum(scores, 0.0)
+        votes = {}
+        for row, weight in zip(rows, weights):
+            votes[self.labels[row]] = votes.get(self.labels[row], 0.0) + float(weight)
+
+        voters = [self.ids[row] for row in rows]
+        if not votes:
+            return '', 0.0, voters
+        best_label = max(votes, key=votes.get)
+        total = float(weights.sum())
+        return best_label, votes[best_label] / total if total > 0 else 0.0, voters
+
+    def save(self, path: str) -> None:
+        """
+        Saves the index to a .npz file (no pickling involved). The reduced vectors are recomputed on load.
+        """
+        np.savez(
+            path,
+            mean=self.mean,
+            projection=self.projection,
+            centroids=self.centroids,
+            vectors=self.vectors,
+            ids=np.array(self.ids, dtype=str),
+            labels=np.array(self.labels, dtype=str),
+            n_probe=self.n_probe,
+            rerank=self.rerank
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        """
+        Loads an index saved with save().
+        """
+        data = np.load(path)
+        index = cls(n_probe=int(data['n_probe']), rerank=int(data['rerank']))
+        index.mean = data['mean']
+        index.projection = data['projection']
+        index.centroids = data['centroids']
+        index.vectors = data['vectors']
+        index.ids = data['ids'].tolist()
+        index.labels = data['labels'].tolist()
+        index.labelled = np.array([bool(label) for label in index.labels], dtype=bool)
+
+        index._reset_lists()
+        index._assign(index._encode(index.vectors), np.arange(len(index.vectors)))
+        return index
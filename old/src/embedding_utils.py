@@ -1,7 +1,34 @@
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-model = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
+MODEL_NAME = 'paraphrase-multilingual-mpnet-base-v2'
+
+_model = None
+
+def get_model(model_path: str = None, offline: bool = False):
+    """
+    Returns the SentenceTransformer model, loading it (and importing sentence_transformers/torch)
+    only on first use, so that importing this module is cheap.
+
+    Args:
+        model_path: Local snapshot directory of the model. Defaults to the EMBEDDING_MODEL_PATH
+            environment variable, or to MODEL_NAME on the Hugging Face Hub.
+        offline: If True, never contacts the Hugging Face Hub. Also enabled by HF_HUB_OFFLINE=1.
+
+    Returns:
+        The loaded SentenceTransformer model.
+    """
+    global _model
+    if _model is None:
+        if offline:
+            os.environ['HF_HUB_OFFLINE'] = '1'
+            os.environ['TRANSFORMERS_OFFLINE'] = '1'
+
+        from sentence_transformers import SentenceTransformer
+
+        model_path = model_path or os.environ.get('EMBEDDING_MODEL_PATH')
+        _model = SentenceTransformer(model_path or MODEL_NAME)
+    return _model
 
 def generate_embedding(text: str) -> np.ndarray:
     """
@@ -14,6 +41,8 @@ def generate_embedding(text: str) -> np.ndarray:
     Returns:
         A numpy array representing the embedding.
     """
+    model = get_model()
+
     if not text or not isinstance(text, str):
         # This ensures the norm is not zero, avoiding division by zero.
         return np.ones(model.get_sentence_embedding_dimension(), dtype=np.float32)
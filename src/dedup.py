@@ -0,0 +1,155 @@
+import re
+import unicodedata
+import zlib
+import numpy as np
+
+# Maior primo abaixo de 2^32: mantém (a * x + b) dentro de uint64 sem overflow
+_PRIME = np.uint64(4294967291)
+
+# Palavras de quantidade/embalagem que podem variar entre duplicatas ("4 Unidades" x "6 Unidades").
+# Qualquer outra palavra diferente (ex.: "com" x "sem", "carga") impede o agrupamento.
+NEUTRAL_WORDS = {
+    'un', 'und', 'unid', 'unidade', 'unidades', 'ml', 'l', 'g', 'kg', 'mg', 'm', 'cm', 'mm', 'x',
+    'litro', 'litros', 'gramas', 'pacote', 'pacotes', 'caixa', 'lata', 'garrafa', 'pote', 'sache', 'refil',
+    'leve', 'pague', 'cada', 'embalagem', 'economica', 'economico', 'pack', 'de', 'e'
+}
+
+# Chamadas promocionais que não mudam o produto ("com 20% de Desconto", "Leve 3 Pague 2"...),
+# removidas antes da comparação. Rodam sobre o texto já em minúsculas e sem acentos.
+PROMO_PATTERNS = [
+    re.compile(r'\b((\d+ ?% )?(de )?(desconto|gratis) )?n[ao] (2a|2o|segund[ao])( (unidade|refil))?\b'),
+    re.compile(r'\b((com|c/) )?(\d+ ?% )?(de )?desconto\b'),
+    re.compile(r'\bleve (mais|\d+) (e )?pague (menos|\d+)\b'),
+    re.compile(r'\b(pague menos|preco especial|promo|oferta( especial)?)\b'),
+    re.compile(r'^\d+ (?=[a-z])')  # "2 Desodorante..." (kit com N unidades)
+]
+
+def normalize_for_dedup(text: str) -> str:
+    """
+    Normalizes a raw product name for near-duplicate detection: lowercase, without diacritics,
+    without promotional wrappers (see PROMO_PATTERNS) and with collapsed whitespace. Unlike
+    clean_text, stop words ('com', 'sem'...) and other numbers are kept, since they distinguish
+    products such as "com gás" and "sem gás".
+
+    Args:
+        text: The raw product name.
+
+    Returns:
+        The normalized product name.
+    """
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('utf-8')
+    text = re.sub(r'(\d) (?=(mg|g|kg|ml|l)\b)', r'\1', re.sub(r'\s+', ' ', text).strip())
+    for pattern in PROMO_PATTERNS:
+        text = pattern.sub(' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def get_words(text: str) -> set[str]:
+    """
+    Returns the alphabetic words of a normalized product name ("500ml" becomes "ml").
+    """
+    return set(re.findall(r'[a-z]+', text))
+
+def get_shingles(text: str, shingle_size: int = 4) -> set[str]:
+    """
+    Splits a normalized product name into overlapping character shingles.
+
+    Args:
+        text: The normalized product name.
+        shingle_size: Number of characters in each shingle.
+
+    Returns:
+        The set of shingles. Names shorter than shingle_size become a single shingle.
+    """
+    if len(text) <= shingle_size:
+        return {text}
+    return {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+
+def jaccard_similarity(a: set[str], b: set[str]) -> float:
+    """
+    Computes the exact Jaccard similarity between two shingle sets.
+    """
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def minhash_signatures(shingle_sets: list[set[str]], num_perm: int = 128, seed: int = 42) -> np.ndarray:
+    """
+    Computes a MinHash signature for each shingle set.
+
+    Args:
+        shingle_sets: One set of shingles per product name.
+        num_perm: Number of hash permutations (signature length).
+        seed: Seed for the random permutation coefficients.
+
+    Returns:
+        A (len(shingle_sets), num_perm) uint64 array of signatures.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for i, shingles in enumerate(shingle_sets):
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (hashes[:, None] * a + b) % _PRIME
+        signatures[i] = permuted.min(axis=0)
+    return signatures
+
+def group_near_duplicates(texts: list[str], threshold: float = 0.8, num_perm: int = 128, bands: int = 32,
+                          shingle_size: int = 4, seed: int = 42) -> list[int]:
+    """
+    Groups near-identical product names using MinHash and LSH banding, in near-linear time.
+
+    Names are processed in order. LSH buckets only propose candidate groups: a name joins a group
+    only when the exact Jaccard similarity to that group's representative (its first name) reaches
+    the threshold, so groups never grow by chaining similar-to-similar names, and when the words
+    that differ from the representative are all quantity/packaging words (see NEUTRAL_WORDS).
+
+    Args:
+        texts: The raw product names. They are normalized with normalize_for_dedup.
+        threshold: Minimum Jaccard similarity to the group representative.
+        num_perm: Number of MinHash permutations. Must be divisible by bands.
+        bands: Number of LSH bands.
+        shingle_size: Number of characters in each shingle.
+        seed: Seed for the MinHash permutations.
+
+    Returns:
+        A group id per name. Ids are consecutive, in order of first appearance, and the first
+        name of each group is its representative.
+    """
+    if num_perm % bands != 0:
+        raise ValueError(f"num_perm ({num_perm}) deve ser divisível por bands ({bands}).")
+
+    normalized = [normalize_for_dedup(text) for text in texts]
+    shingle_sets = [get_shingles(text, shingle_size) for text in normalized]
+    word_sets = [get_words(text) for text in normalized]
+    signatures = minhash_signatures(shingle_sets, num_perm=num_perm, seed=seed)
+    rows = num_perm // bands
+
+    buckets = [{} for _ in range(bands)]
+    representatives = []
+    group_ids = []
+    for i in range(len(texts)):
+        # Cada bucket guarda os grupos (não os nomes) que já passaram por ele
+        band_groups = [
+            buckets[band].setdefault(signatures[i, band * rows:(band + 1) * rows].tobytes(), set())
+            for band in range(bands)
+        ]
+        candidate_groups = set().union(*band_groups)
+
+        best_group, best_similarity = None, threshold
+        for group_id in candidate_groups:
+            representative = representatives[group_id]
+            if not (word_sets[representative] ^ word_sets[i]) <= NEUTRAL_WORDS:
+                continue
+            similarity = jaccard_similarity(shingle_sets[representative], shingle_sets[i])
+            if similarity >= best_similarity:
+                best_group, best_similarity = group_id, similarity
+
+        if best_group is None:
+            best_group = len(representatives)
+            representatives.append(i)
+        group_ids.append(best_group)
+        for groups in band_groups:
+            groups.add(best_group)
+    return group_ids
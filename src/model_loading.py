@@ -0,0 +1,96 @@
+import argparse
+import glob
+import json
+import os
+
+# Arquivo gravado em cada snapshot com o hash do commit baixado
+REVISION_FILE = 'snapshot_revision.json'
+
+def enable_offline_mode() -> None:
+    """
+    Forbids any request to the Hugging Face Hub. Must run before transformers is imported,
+    which is why the heavy imports in this module are done lazily.
+    """
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    os.environ['TRANSFORMERS_OFFLINE'] = '1'
+
+def load_pipeline(task: str, model: str, model_path: str = None, offline: bool = False, **kwargs):
+    """
+    Creates a transformers pipeline, importing transformers/torch only when called.
+
+    Args:
+        task: The pipeline task (e.g. 'zero-shot-classification').
+        model: The model name on the Hugging Face Hub, used when model_path is not given.
+        model_path: Local snapshot directory (see download_snapshot). If it contains
+            safetensors weights, they are loaded memory-mapped instead of unpickled.
+        offline: If True, never contacts the Hub; the model must be in model_path or in the local cache.
+        **kwargs: Extra arguments passed to transformers.pipeline.
+
+    Returns:
+        The loaded pipeline.
+    """
+    if offline:
+        enable_offline_mode()
+
+    from transformers import pipeline
+
+    model_kwargs = kwargs.pop('model_kwargs', {})
+    if model_path:
+        commit_hash = read_snapshot_revision(model_path)
+        print(f"Usando snapshot local '{model_path}' (commit {commit_hash or 'desconhecido'}).")
+        model_kwargs['local_files_only'] = True
+        if glob.glob(os.path.join(model_path, '*.safetensors')):
+            model_kwargs['use_safetensors'] = True
+    elif offline:
+        model_kwargs['local_files_only'] = True
+
+    return pipeline(task, model=model_path or model, model_kwargs=model_kwargs, **kwargs)
+
+def read_snapshot_revision(model_path: str) -> str:
+    """
+    Returns the commit hash recorded by download_snapshot in a snapshot directory, or None.
+    """
+    revision_path = os.path.join(model_path, REVISION_FILE)
+    if not os.path.exists(revision_path):
+        return None
+    with open(revision_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('commit_hash')
+
+def download_snapshot(model: str, local_dir: str, revision: str = None) -> tuple[str, str]:
+    """
+    Downloads a pinned snapshot of a model to a local directory, skipping weights for other frameworks.
+
+    The revision is resolved to a commit hash before downloading, and the hash is recorded in
+    REVISION_FILE inside the snapshot, so that --model_path runs can be traced and reproduced.
+
+    Args:
+        model: The model name on the Hugging Face Hub.
+        local_dir: Destination directory.
+        revision: Commit hash, branch or tag to pin. Defaults to the latest revision.
+
+    Returns:
+        A tuple (path of the local snapshot, resolved commit hash).
+    """
+    from huggingface_hub import HfApi, snapshot_download
+
+    commit_hash = HfApi().model_info(model, revision=revision).sha
+    path = snapshot_download(
+        repo_id=model,
+        revision=commit_hash,
+        local_dir=local_dir,
+        ignore_patterns=['*.h5', '*.msgpack', '*.ot', '*.onnx', 'onnx/*', 'tf_model*', 'flax_model*', 'rust_model*']
+    )
+    with open(os.path.join(path, REVISION_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'model': model, 'revision': revision, 'commit_hash': commit_hash}, f, indent=2)
+    return path, commit_hash
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Baixa um snapshot fixo de um modelo para uso offline (--model_path).")
+    parser.add_argument("model", type=str, help="Nome do modelo no Hugging Face Hub.")
+    parser.add_argument("local_dir", type=str, help="Pasta de destino do snapshot.")
+    parser.add_argument("--revision", type=str, default=None, help="Hash do commit, branch ou tag a fixar. Se omitido, usa a revisão mais recente (o hash resolvido é registrado no snapshot).")
+    args = parser.parse_args()
+
+    path, commit_hash = download_snapshot(args.model, args.local_dir, args.revision)
+    print(f"Snapshot de '{args.model}' (commit {commit_hash}) salvo em '{path}'.")
+    print(f"Hash registrado em '{os.path.join(path, REVISION_FILE)}'. Use --revision {commit_hash} para baixar o mesmo snapshot.")
@@ -0,0 +1,218 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def get_peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the current process in MB, or None if unavailable.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em kilobytes no Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+class RunProfiler:
+    """
+    Collects per-stage timings, throughput and token counts for a pipeline run.
+
+    Progress is printed at most once every `log_interval` seconds instead of once per item.
+    Stage timers are always collected (they are cheap); the structured report, token counts
+    and the optional sampling profiler are only produced when `enabled` is True.
+    """
+
+    def __init__(self, enabled: bool = False, report_path: str = None, log_interval: float = 10.0, sampler: bool = False):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.log_interval = log_interval
+        self.sampler = sampler and enabled
+        self.stages = {}
+        self.tokens_per_forward = []
+        self.total_items = 0
+        self.done_items = 0
+        self._start = time.perf_counter()
+        self._loop_start = None
+        self._last_log = None
+        self._sampling_profiler = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager that adds the elapsed time of its block to the given stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.stages.setdefault(name, {'segundos': 0.0, 'chamadas': 0})
+            stats['segundos'] += elapsed
+            stats['chamadas'] += 1
+
+    def record_tokens(self, num_tokens: int) -> None:
+        if self.enabled:
+            self.tokens_per_forward.append(num_tokens)
+
+    def start_loop(self, total_items: int) -> None:
+        """
+        Marks the beginning of the item loop, used for items/sec and ETA.
+        """
+        self.total_items = total_items
+        self.done_items = 0
+        self._loop_start = self._last_log = time.perf_counter()
+        if self.sampler:
+            self._start_sampler()
+
+    def step(self, num_items: int = 1) -> None:
+        """
+        Registers processed items and prints a progress line if the log interval has elapsed.
+        """
+        self.done_items += num_items
+        now = time.perf_counter()
+        if now - self._last_log >= self.log_interval or self.done_items >= self.total_items:
+            self._last_log = now
+            print(self.progress_line(now))
+
+    def items_per_second(self, now: float = None) -> float:
+        elapsed = (now or time.perf_counter()) - self._loop_start
+        return self.done_items / elapsed if elapsed > 0 else 0.0
+
+    def progress_line(self, now: float) -> str:
+        rate = self.items_per_second(now)
+        remaining = self.total_items - self.done_items
+        eta = format_duration(remaining / rate) if rate > 0 else '--:--:--'
+        percent = self.done_items / self.total_items if self.total_items else 1.0
+        return f"Progresso: {self.done_items}/{self.total_items} ({percent:.1%}) | {rate:.2f} itens/s | ETA {eta}"
+
+    def _start_sampler(self) -> None:
+        try:
+            from pyinstrument import Profiler
+            self._sampling_profiler = Profiler()
+            self._sampling_profiler.start()
+        except ImportError:
+            import cProfile
+            print("Aviso: 'pyinstrument' não está instalado; usando cProfile (determinístico, com mais overhead).")
+            self._sampling_profiler = cProfile.Profile()
+            self._sampling_profiler.enable()
+
+    def _stop_sampler(self, base_path: str) -> str:
+        profiler = self._sampling_profiler
+        if hasattr(profiler, 'stop'):
+            profiler.stop()
+            path = f"{base_path}_amostragem.html"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            path = f"{base_path}_amostragem.prof"
+            profiler.dump_stats(path)
+        return path
+
+    def report(self, extra: dict = None) -> dict:
+        total_seconds = time.perf_counter() - self._start
+        stages = {
+            name: {**stats, 'percentual': stats['segundos'] / total_seconds if total_seconds else 0.0}
+            for name, stats in sorted(self.stages.items(), key=lambda item: -item[1]['segundos'])
+        }
+        tokens = self.tokens_per_forward
+        return {
+            'inicio': datetime.fromtimestamp(time.time() - total_seconds).isoformat(timespec='seconds'),
+            'segundos_total': total_seconds,
+            'itens': self.done_items,
+            'itens_por_segundo': self.items_per_second() if self._loop_start else None,
+            'etapas': stages,
+            'tokens': {
+                'passagens_forward': len(tokens),
+                'total': sum(tokens),
+                'media_por_forward': sum(tokens) / len(tokens) if tokens else None,
+                'maximo_por_forward': max(tokens) if tokens else None
+            },
+            'pico_rss_mb': get_peak_rss_mb(),
+            **(extra or {})
+        }
+
+    def finish(self, extra: dict = None) -> dict:
+        """
+        Stops the sampling profiler, prints a stage summary and writes the JSON run report.
+        Does nothing unless profiling is enabled.
+
+        Args:
+            extra: Additional fields (arguments, model name...) to include in the report.
+
+        Returns:
+            The report dictionary, or None if profiling is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        base_path = os.path.splitext(self.report_path)[0]
+        report = self.report(extra)
+        if self._sampling_profiler is not None:
+            report['arquivo_amostragem'] = self._stop_sampler(base_path)
+
+        print("\nTempo por etapa:")
+        for name, stats in report['etapas'].items():
+            print(f"  {name:<20} {stats['segundos']:>10.2f}s ({stats['percentual']:.1%}, {stats['chamadas']} chamadas)")
+        if report['tokens']['passagens_forward']:
+            print(f"Tokens por passagem forward: média {report['tokens']['media_por_forward']:.1f}, máximo {report['tokens']['maximo_por_forward']}")
+        if report['pico_rss_mb'] is not None:
+            print(f"Pico de memória (RSS): {report['pico_rss_mb']:.0f} MB")
+
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        print(f"Relatório de execução salvo em '{self.report_path}'.")
+        return report
+
+def instrument_pipeline(pipe, profiler: RunProfiler) -> None:
+    """
+    Wraps the preprocess, forward and postprocess steps of a transformers pipeline so that
+    tokenization, forward pass and post-processing are timed as separate stages, and the
+    number of (non-padding) tokens of each forward pass is recorded.
+
+    Args:
+        pipe: A transformers pipeline instance. It is modified in place.
+        profiler: The profiler receiving the measurements.
+    """
+    preprocess, forward, postprocess = pipe.preprocess, pipe._forward, pipe.postprocess
+
+    def timed_iter(iterator):
+        # Pipelines com chunks (ex.: zero-shot) tokenizam de forma preguiçosa, um par por vez
+        iterator = iter(iterator)
+        while True:
+            with profiler.stage('tokenizacao'):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def timed_preprocess(*args, **kwargs):
+        with profiler.stage('tokenizacao'):
+            result = preprocess(*args, **kwargs)
+        return timed_iter(result) if hasattr(result, '__next__') else result
+
+    def timed_forward(model_inputs, **kwargs):
+        if profiler.enabled and 'attention_mask' in model_inputs:
+            profiler.record_tokens(int(model_inputs['attention_mask'].sum()))
+        with profiler.stage('forward'):
+            return forward(model_inputs, **kwargs)
+
+    def timed_postprocess(*args, **kwargs):
+        with profiler.stage('pos_processamento'):
+            return postprocess(*args, **kwargs)
+
+    pipe.preprocess = timed_preprocess
+    pipe._forward = timed_forward
+    pipe.postprocess = timed_postprocess